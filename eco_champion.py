@@ -1,14 +1,27 @@
 # -*- coding: utf-8 -*-
+import os
 import re
 import time
 import json
+from datetime import datetime
 from collections import defaultdict
+from eco_history import TrendHistory
+
+# Counters kept per player, in table column order
+COUNTERS = [
+    'stone_dug', 'sand_dug', 'dirt_dug', 'coal_dug', 'copper_dug',
+    'tin_dug', 'iron_dug', 'gold_dug', 'diamond_dug', 'farming_placed'
+]
 
 class MinetestMonitor:
-    def __init__(self, log_file_path, stats_file='minetest_stats.json'):
+    def __init__(self, log_file_path, stats_file='minetest_stats.json',
+                 history_file='minetest_history.jsonl', summary_file='minetest_summary.json'):
         self.log_file_path = log_file_path
         self.stats_file = stats_file
+        self.summary_file = summary_file
         self.stats = self.load_stats()
+        self.history = TrendHistory(history_file)
+        self.stop_requested = False
     
     def load_stats(self):
         """Load existing stats from file or create new."""
@@ -22,6 +35,35 @@ class MinetestMonitor:
         """Save current stats to file."""
         with open(self.stats_file, 'w') as f:
             json.dump(self.stats, f, indent=2)
+        self.history.flush()
+        self.save_summary()
+    
+    def build_summary(self):
+        """Build one compact row per player, sorted by eco score (best first)."""
+        rows = []
+        for player, stats in self.stats.items():
+            eco_data = self.calculate_eco_score(stats)
+            counts = [stats[key] for key in COUNTERS]
+            rows.append([player] + counts + [
+                sum(counts),
+                eco_data['total_score'],
+                self.get_eco_rating(eco_data['total_score'])
+            ])
+        
+        rows.sort(key=lambda r: r[-2], reverse=True)
+        return {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'columns': ['player'] + COUNTERS + ['total', 'eco_score', 'rating'],
+            'rows': rows
+        }
+    
+    def save_summary(self):
+        """Save the precomputed summary read by the report commands."""
+        # Write then rename, so a report running mid-save never sees a partial file
+        tmp_file = self.summary_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.build_summary(), f, separators=(',', ':'))
+        os.replace(tmp_file, self.summary_file)
     
     def init_player(self, player):
         """Initialize a new player's stats."""
@@ -40,6 +82,11 @@ class MinetestMonitor:
                 'last_seen': None
             }
     
+    def count_event(self, player, counter, line=None):
+        """Increment a player's counter and record it in the daily rollup."""
+        self.stats[player][counter] += 1
+        self.history.record(player, counter, line)
+    
     def calculate_eco_score(self, player_stats):
         """
         Calculate environmental responsibility score.
@@ -117,58 +164,58 @@ class MinetestMonitor:
             
             # Check for specific ore types first (before general stone)
             if block == 'default:stone_with_coal':
-                self.stats[player]['coal_dug'] += 1
+                self.count_event(player, 'coal_dug', line)
                 if verbose:
                     print("[+] {} dug COAL! Total: {}".format(player, self.stats[player]['coal_dug']))
                 return True
             
             elif block == 'default:stone_with_copper':
-                self.stats[player]['copper_dug'] += 1
+                self.count_event(player, 'copper_dug', line)
                 if verbose:
                     print("[+] {} dug COPPER! Total: {}".format(player, self.stats[player]['copper_dug']))
                 return True
             
             elif block == 'default:stone_with_tin':
-                self.stats[player]['tin_dug'] += 1
+                self.count_event(player, 'tin_dug', line)
                 if verbose:
                     print("[+] {} dug TIN! Total: {}".format(player, self.stats[player]['tin_dug']))
                 return True
             
             elif block == 'default:stone_with_iron':
-                self.stats[player]['iron_dug'] += 1
+                self.count_event(player, 'iron_dug', line)
                 if verbose:
                     print("[+] {} dug IRON! Total: {}".format(player, self.stats[player]['iron_dug']))
                 return True
             
             elif block == 'default:stone_with_gold':
-                self.stats[player]['gold_dug'] += 1
+                self.count_event(player, 'gold_dug', line)
                 if verbose:
                     print("[+] {} dug GOLD! Total: {}".format(player, self.stats[player]['gold_dug']))
                 return True
             
             elif block == 'default:stone_with_diamond':
-                self.stats[player]['diamond_dug'] += 1
+                self.count_event(player, 'diamond_dug', line)
                 if verbose:
                     print("[+] {} dug DIAMOND! Total: {}".format(player, self.stats[player]['diamond_dug']))
                 return True
             
             # Check for regular stone (only plain stone, not ores)
             elif block == 'default:stone':
-                self.stats[player]['stone_dug'] += 1
+                self.count_event(player, 'stone_dug', line)
                 if verbose:
                     print("[+] {} dug stone! Total: {}".format(player, self.stats[player]['stone_dug']))
                 return True
             
             # Check if it's sand
             elif block == 'default:sand':
-                self.stats[player]['sand_dug'] += 1
+                self.count_event(player, 'sand_dug', line)
                 if verbose:
                     print("[+] {} dug sand! Total: {}".format(player, self.stats[player]['sand_dug']))
                 return True
             
             # Check if it's dirt
             elif block == 'default:dirt' or block == 'default:dirt_with_grass':
-                self.stats[player]['dirt_dug'] += 1
+                self.count_event(player, 'dirt_dug', line)
                 if verbose:
                     print("[+] {} dug dirt! Total: {}".format(player, self.stats[player]['dirt_dug']))
                 return True
@@ -185,7 +232,7 @@ class MinetestMonitor:
             
             # Check if it's a farming item
             if block.startswith('farming:'):
-                self.stats[player]['farming_placed'] += 1
+                self.count_event(player, 'farming_placed', line)
                 if verbose:
                     print("[+] {} placed {}! Total farming: {}".format(player, block, self.stats[player]['farming_placed']))
                 return True
@@ -193,9 +240,13 @@ class MinetestMonitor:
         return False
     
     def process_existing_log(self, clear_stats=False):
-        """Process entire existing log file (for testing/catching up)."""
+        """Process entire existing log file (for testing/catching up).
+        
+        Returns True on success, False if the log could not be processed.
+        """
         if clear_stats:
             self.stats = {}
+            self.history.clear()
             print("Cleared existing stats.")
         
         print("Processing existing log: {}".format(self.log_file_path))
@@ -222,11 +273,13 @@ class MinetestMonitor:
             
             self.save_stats()
             print("  Stats saved to: {}".format(self.stats_file))
+            return True
             
         except IOError:
             print("Error: Log file not found at {}".format(self.log_file_path))
         except Exception as e:
             print("Error processing log: {}".format(e))
+        return False
     
     def print_table(self):
         """Print statistics in a pretty formatted table."""
@@ -392,20 +445,27 @@ class MinetestMonitor:
         print("!!! = Bottom 3 Most Destructive")
         print()
     
+    def stop(self):
+        """Ask monitor() to return after the line it is processing (signal-safe)."""
+        self.stop_requested = True
+    
     def monitor(self):
-        """Monitor the log file in real-time."""
+        """Monitor the log file in real-time until stop() is called."""
         print("Starting Minetest monitor...")
         print("Tracking: stone, sand, dirt, ores (coal/copper/tin/iron/gold/diamond), farming")
         print("Stats saved to: {}".format(self.stats_file))
         print("-" * 50)
         
+        # Downsample old history once per monitor start
+        self.history.compact()
+        
         with open(self.log_file_path, 'r') as log_file:
             # Start from end of file (only monitor new entries)
             log_file.seek(0, 2)
             
             save_counter = 0
             
-            while True:
+            while not self.stop_requested:
                 line = log_file.readline()
                 
                 if not line:
@@ -427,6 +487,12 @@ class MinetestMonitor:
 
 # Usage examples
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        # Non-interactive use (cron/systemd): see eco_cli.py --help
+        import eco_cli
+        sys.exit(eco_cli.main())
+    
     # Replace with your actual log file path
     LOG_FILE = "debug.txt"
     
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Non-interactive command line for the eco monitor, for cron and systemd.
+
+    python eco_cli.py ingest debug.txt --clear
+    python eco_cli.py tail debug.txt
+    python eco_cli.py report --format json --output report.json
+    python eco_cli.py leaderboard --top 5
+    python eco_cli.py trend --player alice --category ores
+    python eco_cli.py reconcile --db players.sqlite
+
+report and leaderboard normally read only the small summary file written on
+every save. If that file is missing or unreadable they fall back to loading
+the stats file through the monitor and rebuilding it. The monitor, history,
+reconcile and csv modules are imported only by the commands that use them.
+"""
+import time
+
+_START = time.perf_counter()
+
+import sys
+import json
+
+SUMMARY_COLUMNS = [
+    ('player', 'Player'), ('stone_dug', 'Stone'), ('sand_dug', 'Sand'),
+    ('dirt_dug', 'Dirt'), ('coal_dug', 'Coal'), ('copper_dug', 'Copper'),
+    ('tin_dug', 'Tin'), ('iron_dug', 'Iron'), ('gold_dug', 'Gold'),
+    ('diamond_dug', 'Diamnd'), ('farming_placed', 'Farming'), ('total', 'Total'),
+    ('eco_score', 'Eco Score'), ('rating', 'Rating')
+]
+
+LEADERBOARD_COLUMNS = [
+    ('rank', 'Rank'), ('player', 'Player'), ('eco_score', 'Eco Score'), ('rating', 'Rating')
+]
+
+RECONCILE_COLUMNS = [
+    ('player', 'Player'), ('ore', 'Ore'), ('dug', 'Dug'), ('held', 'Held'), ('surplus', 'Surplus')
+]
+
+
+def build_parser():
+    """Build the argument parser."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Minetest eco monitor")
+    parser.add_argument('--stats', default='minetest_stats.json', help="stats file")
+    parser.add_argument('--summary', default='minetest_summary.json', help="summary file")
+    parser.add_argument('--history', default='minetest_history.jsonl', help="rollup history file")
+    parser.add_argument('--timing', action='store_true',
+                        help="print elapsed time since process start to stderr")
+    sub = parser.add_subparsers(dest='command')
+
+    ingest = sub.add_parser('ingest', help="process an existing log file")
+    ingest.add_argument('log_file')
+    ingest.add_argument('--clear', action='store_true', help="clear existing stats first")
+
+    tail = sub.add_parser('tail', help="monitor a log file in real time")
+    tail.add_argument('log_file')
+
+    for name, help_text in (('report', "per-player stats"), ('leaderboard', "eco leaderboard")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+        cmd.add_argument('--output', help="write to this file instead of stdout")
+        if name == 'leaderboard':
+            cmd.add_argument('--top', type=int, default=10, help="number of players to show")
+
+    trend = sub.add_parser('trend', help="time series from the rollup history")
+    trend.add_argument('--player')
+    trend.add_argument('--team')
+    trend.add_argument('--teams', help="JSON file mapping team name to a list of players")
+    trend.add_argument('--category', help="ores, landscape, stone, farming or a counter name")
+    trend.add_argument('--start', help="first date (YYYY-MM-DD, inclusive)")
+    trend.add_argument('--end', help="last date (YYYY-MM-DD, exclusive)")
+    trend.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+    trend.add_argument('--output', help="write to this file instead of stdout")
+
+    reconcile = sub.add_parser('reconcile', help="compare dug ores with inventories")
+    reconcile.add_argument('--db', default='players.sqlite')
+    reconcile.add_argument('--min-surplus', type=int, default=10)
+    reconcile.add_argument('--ratio', type=float, default=0.5)
+    reconcile.add_argument('--format', choices=['table', 'json', 'csv'], default='table')
+    reconcile.add_argument('--output', help="write to this file instead of stdout")
+
+    return parser
+
+
+def make_monitor(args, log_file=None):
+    """Create the full monitor (imports the parsing and history modules)."""
+    from eco_champion import MinetestMonitor
+    return MinetestMonitor(log_file, stats_file=args.stats,
+                           history_file=args.history, summary_file=args.summary)
+
+
+def load_summary(args):
+    """Load the precomputed summary, rebuilding it from the stats file if missing or unreadable."""
+    try:
+        with open(args.summary, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, IOError, ValueError):
+        monitor = make_monitor(args)
+        monitor.save_summary()
+        return monitor.build_summary()
+
+
+def summary_rows(summary, limit=None):
+    """Turn the summary's column/row arrays into a list of dicts."""
+    columns = summary['columns']
+    rows = summary['rows'] if limit is None else summary['rows'][:max(limit, 0)]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def render_table(rows, columns):
+    """Render rows as a plain text table."""
+    cells = [[label for _, label in columns]]
+    for row in rows:
+        cells.append([
+            "{:,}".format(row[key]) if isinstance(row[key], int) else str(row[key])
+            for key, _ in columns
+        ])
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+
+    lines = []
+    for n, line in enumerate(cells):
+        lines.append(" | ".join(
+            cell.ljust(width) if i == 0 or not cell[-1:].isdigit() else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(line, widths))
+        ).rstrip())
+        if n == 0:
+            lines.append("-" * len(lines[0]))
+    return "\n".join(lines) + "\n"
+
+
+def write_output(args, rows, columns, meta=None):
+    """Write rows in the requested format to stdout or --output."""
+    if args.format == 'json':
+        data = dict(meta or {})
+        data['rows'] = rows
+        text = json.dumps(data, indent=2) + "\n"
+    elif args.format == 'csv':
+        import csv
+        import io
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=[key for key, _ in columns],
+                                extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+        text = buf.getvalue()
+    else:
+        text = render_table(rows, columns)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def cmd_ingest(args):
+    monitor = make_monitor(args, args.log_file)
+    if not monitor.process_existing_log(clear_stats=args.clear):
+        return 1
+    return 0
+
+
+def cmd_tail(args):
+    import signal
+
+    monitor = make_monitor(args, args.log_file)
+    # Ctrl+C and systemd's SIGTERM only set a flag, so the monitor stops
+    # between lines rather than in the middle of a save
+    signal.signal(signal.SIGINT, lambda signum, frame: monitor.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: monitor.stop())
+    try:
+        monitor.monitor()
+    except IOError:
+        print("Error: Log file not found at {}".format(args.log_file), file=sys.stderr)
+        return 1
+
+    print("\nStopping monitor...")
+    monitor.save_stats()
+    return 0
+
+
+def cmd_report(args):
+    summary = load_summary(args)
+    write_output(args, summary_rows(summary), SUMMARY_COLUMNS,
+                 meta={'generated': summary.get('generated')})
+    return 0
+
+
+def cmd_leaderboard(args):
+    summary = load_summary(args)
+    rows = []
+    for rank, row in enumerate(summary_rows(summary, args.top), 1):
+        rows.append({
+            'rank': rank, 'player': row['player'],
+            'eco_score': row['eco_score'], 'rating': row['rating']
+        })
+    write_output(args, rows, LEADERBOARD_COLUMNS,
+                 meta={'generated': summary.get('generated')})
+    return 0
+
+
+def cmd_trend(args):
+    from eco_history import TrendHistory
+
+    teams = None
+    if args.teams:
+        with open(args.teams, 'r') as f:
+            teams = json.load(f)
+    if args.team and not teams:
+        print("Error: --team needs --teams FILE", file=sys.stderr)
+        return 2
+
+    history = TrendHistory(args.history)
+    try:
+        series = history.query(player=args.player, team=args.team, teams=teams,
+                               category=args.category, start=args.start, end=args.end)
+    except ValueError as e:
+        print("Error: {}".format(e), file=sys.stderr)
+        return 2
+    rows = [{'start': start, 'period': period, 'days': days, 'value': value}
+            for start, period, days, value in series]
+    write_output(args, rows, [('start', 'Start'), ('period', 'Period'),
+                              ('days', 'Days'), ('value', 'Value')])
+    return 0
+
+
+def cmd_reconcile(args):
+    import sqlite3
+    from eco_reconcile import InventoryReconciler
+
+    reconciler = InventoryReconciler(stats_file=args.stats, db_file=args.db,
+                                     min_surplus=args.min_surplus, surplus_ratio=args.ratio)
+    try:
+        rows = reconciler.sorted_mismatches()
+    except sqlite3.Error as e:
+        print("Error reading inventory database {}: {}".format(args.db, e), file=sys.stderr)
+        return 1
+    write_output(args, rows, RECONCILE_COLUMNS,
+                 meta={'min_surplus': args.min_surplus, 'ratio': args.ratio})
+    return 0
+
+
+COMMANDS = {
+    'ingest': cmd_ingest,
+    'tail': cmd_tail,
+    'report': cmd_report,
+    'leaderboard': cmd_leaderboard,
+    'trend': cmd_trend,
+    'reconcile': cmd_reconcile,
+}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 2
+
+    status = COMMANDS[args.command](args)
+
+    if args.timing:
+        print("elapsed: {:.1f} ms".format((time.perf_counter() - _START) * 1000),
+              file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+from datetime import date, datetime, timedelta
+from collections import defaultdict
+from itertools import chain
+
+# Named groups of counters that can be queried as one series.
+CATEGORIES = {
+    'ores': ['coal_dug', 'copper_dug', 'tin_dug', 'iron_dug', 'gold_dug', 'diamond_dug'],
+    'landscape': ['dirt_dug', 'sand_dug'],
+    'stone': ['stone_dug'],
+    'farming': ['farming_placed'],
+}
+
+# Every counter the monitor records (each belongs to exactly one category)
+COUNTERS = [counter for counters in CATEGORIES.values() for counter in counters]
+
+# Minetest debug.txt lines start with "2024-01-15 14:23:01: ACTION[Server]: ..."
+LOG_DATE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2}) ')
+
+
+def month_start(day):
+    """Return the first day of the month containing `day`."""
+    return day.replace(day=1)
+
+
+def next_month_start(day):
+    """Return the first day of the month after the one containing `day`."""
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def week_start(day):
+    """
+    Return the start of the week bucket containing `day`.
+
+    Weeks start on Monday but are clipped at month boundaries, so every week
+    lies inside one month and day/week/month buckets nest without overlap.
+    """
+    return max(day - timedelta(days=day.weekday()), month_start(day))
+
+
+def period_end(period, start):
+    """Return the (exclusive) end date of the bucket starting at `start`."""
+    if period == 'day':
+        return start + timedelta(days=1)
+    if period == 'week':
+        return min(start - timedelta(days=start.weekday()) + timedelta(days=7),
+                   next_month_start(start))
+    return next_month_start(start)
+
+
+def parse_date(value):
+    """Parse an ISO date string."""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class TrendHistory:
+    def __init__(self, history_file='minetest_history.jsonl', daily_days=56, weekly_days=365,
+                 compact_every=1000):
+        self.history_file = history_file
+        # Day records older than daily_days are merged into weeks, and weeks
+        # older than weekly_days into months, so the file stays small.
+        self.daily_days = daily_days
+        self.weekly_days = weekly_days
+        # A long-running monitor appends on every save; compact after this
+        # many appended records, or on the first save of a new day.
+        self.compact_every = compact_every
+        self.appended = 0
+        self.compacted_on = None
+        # Set by clear(): the file is replaced on the next write, not deleted
+        # straight away, so a failed rebuild leaves the old history intact.
+        self.truncate = False
+        self.pending = defaultdict(lambda: defaultdict(int))
+
+    def log_date(self, line):
+        """Return the ISO date a log line was written, or today if it has none."""
+        match = LOG_DATE_PATTERN.match(line) if line else None
+        if match:
+            return match.group(1)
+        return date.today().isoformat()
+
+    def record(self, player, counter, line=None):
+        """Count one event for `player` in the day bucket of the log line."""
+        self.pending[(self.log_date(line), player)][counter] += 1
+
+    def iter_pending(self):
+        """Yield pending (not yet written) counts as day records."""
+        for (day, player), counts in sorted(self.pending.items()):
+            yield {'period': 'day', 'start': day, 'player': player, 'counts': dict(counts)}
+
+    def append_pending(self):
+        """Append pending day records to the history file."""
+        if not self.pending and not self.truncate:
+            return
+        lines = [json.dumps(rec, separators=(',', ':')) + '\n' for rec in self.iter_pending()]
+
+        if self.truncate:
+            tmp_file = self.history_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                f.writelines(lines)
+            os.replace(tmp_file, self.history_file)
+            self.truncate = False
+        else:
+            with open(self.history_file, 'a') as f:
+                f.writelines(lines)
+        self.appended += len(self.pending)
+        self.pending.clear()
+
+    def flush(self):
+        """Append pending records, compacting when enough have piled up."""
+        self.append_pending()
+        if self.appended >= self.compact_every or self.compacted_on != date.today():
+            self.compact()
+
+    def clear(self):
+        """Drop all history (used when stats are rebuilt from scratch).
+
+        The file itself is only replaced on the next flush.
+        """
+        self.pending.clear()
+        self.appended = 0
+        self.truncate = True
+
+    def iter_records(self):
+        """Yield every stored record, oldest writes first."""
+        if self.truncate:
+            return
+        try:
+            with open(self.history_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        except (FileNotFoundError, IOError):
+            return
+
+    def bucket_for(self, period, start, today):
+        """
+        Return the (period, start) a record should live in at this age.
+
+        A record is folded only once the whole coarser bucket is past the
+        cutoff, so a week or month is never split across granularities.
+        """
+        day = parse_date(start)
+
+        if period != 'month' and next_month_start(day) <= today - timedelta(days=self.weekly_days):
+            return 'month', month_start(day).isoformat()
+        if period == 'day':
+            week = week_start(day)
+            if period_end('week', week) <= today - timedelta(days=self.daily_days):
+                return 'week', week.isoformat()
+        return period, start
+
+    def compact(self, today=None):
+        """Downsample aged records and merge duplicates, rewriting the file."""
+        self.append_pending()
+        today = today or date.today()
+        self.appended = 0
+        self.compacted_on = date.today()
+
+        merged = defaultdict(lambda: defaultdict(int))
+        for rec in self.iter_records():
+            period, start = self.bucket_for(rec['period'], rec['start'], today)
+            counts = merged[(start, period, rec['player'])]
+            for counter, value in rec['counts'].items():
+                counts[counter] += value
+
+        if not merged:
+            return
+
+        tmp_file = self.history_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            for (start, period, player), counts in sorted(merged.items()):
+                f.write(json.dumps({
+                    'period': period, 'start': start, 'player': player, 'counts': dict(counts)
+                }, separators=(',', ':')) + '\n')
+        os.replace(tmp_file, self.history_file)
+
+    def query(self, player=None, team=None, teams=None, category=None, start=None, end=None):
+        """
+        Return a time series as a sorted list of (start, period, days, value).
+
+        `days` is how many days the bucket covers. Weeks are clipped at month
+        boundaries, so a week point can cover anywhere from 1 to 7 days.
+
+        player:   only count this player
+        team:     only count players listed under this name in `teams`
+                  (a dict of team name -> list of players)
+        category: a CATEGORIES name or a single counter such as 'diamond_dug';
+                  all counters are summed when omitted. Anything else raises
+                  ValueError.
+        start/end: ISO dates, start inclusive and end exclusive
+
+        Older points come back at week or month granularity once compacted.
+        Any bucket that overlaps start/end is returned whole, so the first
+        and last points may cover days outside the range.
+        """
+        if team is not None:
+            members = set((teams or {}).get(team, []))
+        elif player is not None:
+            members = set([player])
+        else:
+            members = None
+
+        if category is None:
+            counters = None
+        elif category in CATEGORIES:
+            counters = CATEGORIES[category]
+        elif category in COUNTERS:
+            counters = [category]
+        else:
+            raise ValueError("Unknown category '{}' (expected one of: {})".format(
+                category, ", ".join(sorted(CATEGORIES) + COUNTERS)))
+
+        series = defaultdict(int)
+        for rec in chain(self.iter_records(), self.iter_pending()):
+            if members is not None and rec['player'] not in members:
+                continue
+            if (start is not None and rec['start'] < start
+                    and period_end(rec['period'], parse_date(rec['start'])).isoformat() <= start):
+                continue
+            if end is not None and rec['start'] >= end:
+                continue
+
+            if counters is None:
+                value = sum(rec['counts'].values())
+            else:
+                value = sum(rec['counts'].get(c, 0) for c in counters)
+            series[(rec['start'], rec['period'])] += value
+
+        points = []
+        for (s, period), value in sorted(series.items()):
+            bucket_start = parse_date(s)
+            points.append((s, period, (period_end(period, bucket_start) - bucket_start).days, value))
+        return points
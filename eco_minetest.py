@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
+# DEPRECATED: this is the original stone/sand/farming monitor. Use
+# eco_champion.py (interactive) or eco_cli.py (cron/systemd) instead; they
+# track the same events plus ores, and add the summary and trend history.
+# This script keeps its own stats format, so don't point both at the same
+# stats file.
 import re
 import time
 import json
@@ -198,6 +203,8 @@ class MinetestMonitor:
 
 # Usage examples
 if __name__ == "__main__":
+    print("Note: eco_minetest.py is deprecated, use eco_champion.py or eco_cli.py instead.\n")
+    
     # Replace with your actual log file path
     LOG_FILE = "/path/to/minetest/debug.txt"
     
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+import json
+import sqlite3
+from itertools import groupby
+
+# Log counter in minetest_stats.json -> inventory items that count towards it.
+# Each item maps to how many ores it represents (a block is 9 lumps/ingots).
+ORE_ITEMS = {
+    'coal_dug': {
+        'default:coal_lump': 1,
+        'default:stone_with_coal': 1,
+        'default:coalblock': 9,
+    },
+    'copper_dug': {
+        'default:copper_lump': 1,
+        'default:copper_ingot': 1,
+        'default:stone_with_copper': 1,
+        'default:copperblock': 9,
+    },
+    'tin_dug': {
+        'default:tin_lump': 1,
+        'default:tin_ingot': 1,
+        'default:stone_with_tin': 1,
+        'default:tinblock': 9,
+    },
+    'iron_dug': {
+        'default:iron_lump': 1,
+        'default:steel_ingot': 1,
+        'default:stone_with_iron': 1,
+        'default:steelblock': 9,
+    },
+    'gold_dug': {
+        'default:gold_lump': 1,
+        'default:gold_ingot': 1,
+        'default:stone_with_gold': 1,
+        'default:goldblock': 9,
+    },
+    'diamond_dug': {
+        'default:diamond': 1,
+        'default:stone_with_diamond': 1,
+        'default:diamondblock': 9,
+    },
+}
+
+# Inventory lists that hold real items. craftpreview/craftresult only show
+# what a craft would produce, so counting them would double-count the grid.
+COUNTED_INVENTORIES = ('main', 'craft')
+
+# Reverse lookup: item name -> (counter, multiplier)
+ITEM_TO_ORE = {}
+for _ore, _items in ORE_ITEMS.items():
+    for _item, _mult in _items.items():
+        ITEM_TO_ORE[_item] = (_ore, _mult)
+
+
+def parse_itemstring(itemstring):
+    """Split a Minetest itemstring ("default:diamond 5 ...") into (name, count)."""
+    parts = itemstring.split()
+    if not parts:
+        return None, 0
+    count = 1
+    if len(parts) > 1:
+        try:
+            count = int(parts[1])
+        except ValueError:
+            count = 1
+    return parts[0], count
+
+
+class InventoryReconciler:
+    def __init__(self, stats_file='minetest_stats.json', db_file='players.sqlite',
+                 min_surplus=10, surplus_ratio=0.5):
+        self.stats_file = stats_file
+        self.db_file = db_file
+        # A player is flagged when they hold at least min_surplus more of an ore
+        # than the log says they dug, and the surplus is more than surplus_ratio
+        # of what they dug. Holding less than was dug is normal (crafting, use).
+        self.min_surplus = min_surplus
+        self.surplus_ratio = surplus_ratio
+
+    def iter_log_counts(self):
+        """Yield (player, {ore: count}) from the stats file, sorted by player."""
+        try:
+            with open(self.stats_file, 'r') as f:
+                stats = json.load(f)
+        except (FileNotFoundError, IOError):
+            stats = {}
+
+        for player in sorted(stats):
+            player_stats = stats[player]
+            yield player, dict((ore, player_stats.get(ore, 0)) for ore in ORE_ITEMS)
+
+    def iter_inventory_counts(self):
+        """Yield (player, {ore: count}) from players.sqlite, sorted by player.
+
+        Rows are streamed from the database cursor, so only one player's
+        inventory is held in memory at a time.
+        """
+        # Read-only, so a wrong path fails instead of creating an empty database
+        conn = sqlite3.connect('file:{}?mode=ro'.format(self.db_file), uri=True)
+        try:
+            cursor = conn.execute(
+                "SELECT items.player, items.item FROM player_inventory_items AS items"
+                " JOIN player_inventories AS inv"
+                " ON inv.player = items.player AND inv.inv_id = items.inv_id"
+                " WHERE inv.inv_name IN ({})"
+                " ORDER BY items.player".format(", ".join("?" * len(COUNTED_INVENTORIES))),
+                COUNTED_INVENTORIES
+            )
+            for player, rows in groupby(cursor, key=lambda row: row[0]):
+                held = dict((ore, 0) for ore in ORE_ITEMS)
+                for _, item in rows:
+                    name, count = parse_itemstring(item or '')
+                    if name in ITEM_TO_ORE:
+                        ore, mult = ITEM_TO_ORE[name]
+                        held[ore] += count * mult
+                yield player, held
+        finally:
+            conn.close()
+
+    def merge(self):
+        """Merge-join both sorted streams, yielding (player, dug, held)."""
+        empty = dict((ore, 0) for ore in ORE_ITEMS)
+        log_iter = self.iter_log_counts()
+        inv_iter = self.iter_inventory_counts()
+        log_item = next(log_iter, None)
+        inv_item = next(inv_iter, None)
+
+        while log_item is not None or inv_item is not None:
+            if inv_item is None or (log_item is not None and log_item[0] < inv_item[0]):
+                yield log_item[0], log_item[1], empty
+                log_item = next(log_iter, None)
+            elif log_item is None or inv_item[0] < log_item[0]:
+                yield inv_item[0], empty, inv_item[1]
+                inv_item = next(inv_iter, None)
+            else:
+                yield log_item[0], log_item[1], inv_item[1]
+                log_item = next(log_iter, None)
+                inv_item = next(inv_iter, None)
+
+    def is_suspicious(self, dug, held):
+        """Return True if holding `held` ores is not explained by digging `dug`."""
+        surplus = held - dug
+        return surplus >= self.min_surplus and surplus > dug * self.surplus_ratio
+
+    def find_mismatches(self):
+        """Yield a dict for every (player, ore) pair that looks suspicious."""
+        for player, dug_counts, held_counts in self.merge():
+            for ore in ORE_ITEMS:
+                dug = dug_counts[ore]
+                held = held_counts[ore]
+                if self.is_suspicious(dug, held):
+                    yield {
+                        'player': player,
+                        'ore': ore[:-len('_dug')],
+                        'dug': dug,
+                        'held': held,
+                        'surplus': held - dug
+                    }
+
+    def sorted_mismatches(self):
+        """Return all flagged mismatches, largest surplus first."""
+        return sorted(self.find_mismatches(), key=lambda m: m['surplus'], reverse=True)
+
+    def print_report(self):
+        """Print flagged mismatches in a formatted table."""
+        try:
+            mismatches = self.sorted_mismatches()
+        except sqlite3.Error as e:
+            print("Error reading inventory database {}: {}".format(self.db_file, e))
+            return False
+
+        if not mismatches:
+            print("\nNo suspicious inventory mismatches found.\n")
+            return True
+
+        max_name_len = max(len(m['player']) for m in mismatches)
+        max_name_len = max(max_name_len, len("Player"))
+
+        separator = "=" * (max_name_len + 46)
+        print("\n" + separator)
+        print("INVENTORY RECONCILIATION (held vs. dug)")
+        print(separator)
+        print("{:<{}} | {:<8} | {:>8} | {:>8} | {:>9}".format(
+            "Player", max_name_len, "Ore", "Dug", "Held", "Surplus"
+        ))
+        print(separator)
+
+        for m in mismatches:
+            print("{:<{}} | {:<8} | {:>8,} | {:>8,} | {:>+9,}".format(
+                m['player'], max_name_len, m['ore'], m['dug'], m['held'], m['surplus']
+            ))
+
+        print(separator)
+        print("\nFlagged: {} (min surplus {}, ratio {})".format(
+            len(mismatches), self.min_surplus, self.surplus_ratio
+        ))
+        print()
+        return True
+
+
+if __name__ == "__main__":
+    import sys
+    reconciler = InventoryReconciler()
+    sys.exit(0 if reconciler.print_report() else 1)